@@ -15,10 +15,23 @@ Options:
 
 import os
 import sys
+import logging
 import argparse
-import subprocess
-import tempfile
-import json
+from concurrent.futures import ThreadPoolExecutor
+
+# Import the shared helpers whether run as a script or as part of the package
+try:
+    from .code2prompt_utils import (
+        get_code2prompt_version,
+        install_code2prompt,
+        get_codebase
+    )
+except ImportError:
+    from code2prompt_utils import (
+        get_code2prompt_version,
+        install_code2prompt,
+        get_codebase
+    )
 
 
 def print_header(text):
@@ -28,132 +41,6 @@ def print_header(text):
     print("=" * 60)
 
 
-def check_code2prompt_installed():
-    """Check if code2prompt is installed"""
-    try:
-        result = subprocess.run(
-            ["code2prompt", "--version"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=False
-        )
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
-
-
-def install_code2prompt():
-    """Install code2prompt using cargo"""
-    print_header("INSTALLING CODE2PROMPT")
-    
-    # Check if cargo is installed
-    try:
-        cargo_check = subprocess.run(
-            ["cargo", "--version"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=False
-        )
-        
-        if cargo_check.returncode != 0:
-            print("❌ Cargo is not installed.")
-            print("Please install Rust and Cargo first: https://www.rust-lang.org/tools/install")
-            return False
-        
-        print("✅ Cargo is installed. Installing code2prompt...")
-        
-        # Install code2prompt
-        install_process = subprocess.run(
-            ["cargo", "install", "code2prompt"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=False
-        )
-        
-        if install_process.returncode == 0:
-            print("✅ code2prompt installed successfully!")
-            return True
-        else:
-            print(f"❌ Failed to install code2prompt: {install_process.stderr.decode()}")
-            return False
-    except Exception as e:
-        print(f"❌ Error during installation: {str(e)}")
-        return False
-
-
-def get_codebase(codebase_path=None):
-    """
-    Generate a prompt containing the entire codebase using code2prompt
-    
-    Args:
-        codebase_path: Path to the codebase. If None, uses current directory.
-    
-    Returns:
-        str: The formatted codebase prompt
-    """
-    if codebase_path is None:
-        codebase_path = os.getcwd()
-    
-    print(f"Processing codebase at: {codebase_path}")
-    
-    # Create a temporary file to store the output
-    with tempfile.NamedTemporaryFile(mode='w+', delete=False) as temp_file:
-        temp_path = temp_file.name
-    
-    # Default extensions to include
-    code_extensions = [
-        "*.py", "*.js", "*.jsx", "*.ts", "*.tsx", "*.css", "*.scss", "*.html",
-        "*.vue", "*.go", "*.java", "*.cpp", "*.c", "*.h", "*.rs", "*.sql", 
-        "*.md", "*.txt", "*.json", "*.yaml", "*.yml", "*.toml", "*.ini", 
-        "*.conf", "*.cfg", "*.properties", "*.env", "*.lock"
-    ]
-    
-    # Build command
-    cmd = [
-        "code2prompt", 
-        codebase_path,
-        "--filter", ",".join(code_extensions),
-        "--exclude", "package-lock.json",
-        "--line-number",
-        "--tokens",
-        "--output", temp_path
-    ]
-    
-    print(f"Running command: {' '.join(cmd)}")
-    
-    try:
-        # Run code2prompt
-        process = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=False
-        )
-        
-        if process.returncode != 0:
-            print(f"❌ Error running code2prompt: {process.stderr.decode()}")
-            os.unlink(temp_path)
-            return ""
-        
-        # Read the result from the temporary file
-        with open(temp_path, 'r') as f:
-            content = f.read()
-        
-        # Delete the temporary file
-        os.unlink(temp_path)
-        
-        return content
-    
-    except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        
-        # Clean up temp file if it exists
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-            
-        return ""
-
-
 def test_code2prompt(codebase_path=None):
     """Run a test to analyze a codebase with code2prompt"""
     print_header("TESTING CODE2PROMPT")
@@ -194,9 +81,8 @@ def main():
 
     Dependencies:
         - argparse: Used for parsing command-line arguments.
-        - subprocess: Used for running shell commands to check and install code2prompt.
-        - check_code2prompt_installed: Function to check if code2prompt is installed.
-        - install_code2prompt: Function to install code2prompt using cargo.
+        - get_code2prompt_version: Function from code2prompt_utils to check if code2prompt is installed and get its version.
+        - install_code2prompt: Function from code2prompt_utils to install code2prompt using cargo.
         - test_code2prompt: Function to test code2prompt on a specified codebase.
         - print_header: Function to print formatted headers.
 
@@ -212,30 +98,46 @@ def main():
     parser.add_argument("--path", help="Path to the codebase to analyze (default: current directory)")
     args = parser.parse_args()
     
+    # Show progress and errors logged by code2prompt_utils
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    
     print_header("CODE2PROMPT INSTALLER & TESTER")
     print("This script will install and test code2prompt, a tool to convert")
     print("your codebase into a single LLM prompt.")
     print("\nFor more information, visit: https://github.com/mufeedvh/code2prompt")
     
+    # Query the code2prompt version in the background while the codebase is located
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        version_future = executor.submit(get_code2prompt_version)
+        
+        codebase_path = args.path or os.getcwd()
+        if not args.install_only:
+            # Warm the directory cache for the walk in test_code2prompt
+            try:
+                with os.scandir(codebase_path) as entries:
+                    list(entries)
+            except OSError:
+                pass
+        
+        code2prompt_version = version_future.result()
+    
     # Check if code2prompt is already installed
-    if check_code2prompt_installed():
+    if code2prompt_version is not None:
         print("✅ code2prompt is already installed")
-        code2prompt_version = subprocess.run(
-            ["code2prompt", "--version"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=False
-        )
-        print(f"Version: {code2prompt_version.stdout.decode().strip()}")
+        print(f"Version: {code2prompt_version}")
     else:
         # Install code2prompt
+        print_header("INSTALLING CODE2PROMPT")
         if not install_code2prompt():
             print("❌ Installation failed. Please install manually.")
             return 1
     
     # Run tests if not install-only
     if not args.install_only:
-        test_code2prompt(args.path)
+        test_code2prompt(codebase_path)
     
     print_header("COMPLETED")
     return 0
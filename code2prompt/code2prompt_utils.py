@@ -1,35 +1,99 @@
 import os
+import functools
+import shutil
 import subprocess
 import logging
 import json
+import mmap
 import tempfile
 from typing import Dict, List, Optional, Union, Any
 
-# Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# code2prompt-rs Python bindings let us generate the prompt in-process
+try:
+    from code2prompt_rs import Code2Prompt
+except ImportError:
+    Code2Prompt = None
+
+# orjson decodes and parses JSON bytes in a single pass when it is available
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Directory for code2prompt's output file; /tmp is typically tmpfs-backed on Linux
+_TEMP_DIR = '/tmp' if os.path.isdir('/tmp') else None
+
+# Module logger; handlers are left to the application to configure
 logger = logging.getLogger(__name__)
 
+# Default include patterns - match the legacy implementation's extensions
+CODE_PATTERNS = (
+    "*.py", "*.js", "*.jsx", "*.ts", "*.tsx", "*.css", "*.scss", "*.html",
+    "*.vue", "*.go", "*.java", "*.cpp", "*.c", "*.h", "*.rs", "*.sql", 
+    "*.md", "*.txt", "*.json", "*.yaml", "*.yml", "*.toml", "*.ini", 
+    "*.conf", "*.cfg", "*.properties", "*.env", "*.lock"
+)
 
-def check_code2prompt_installed() -> bool:
+# Exclude package-lock.json files to match the legacy implementation
+EXCLUDE_PATTERNS = ("package-lock.json",)
+
+# Pre-joined --include/--exclude arguments for the default patterns
+_DEFAULT_INCLUDE_STR = ",".join(CODE_PATTERNS)
+_DEFAULT_EXCLUDE_STR = ",".join(EXCLUDE_PATTERNS)
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_executable(name: str) -> str:
     """
-    Check if code2prompt is installed.
+    Resolve an executable name to its absolute path on PATH.
+    
+    subprocess only uses its posix_spawn fast path when the executable includes a
+    directory, so bare names would still go through fork+exec. Names that are not
+    on PATH are returned unchanged, so running them still raises FileNotFoundError.
+    
+    Args:
+        name: Name of the executable (e.g. "code2prompt")
     
     Returns:
-        bool: True if code2prompt is installed, False otherwise
+        str: The absolute path, or name if it could not be found
+    """
+    return shutil.which(name) or name
+
+
+@functools.lru_cache(maxsize=1)
+def get_code2prompt_version() -> Optional[str]:
+    """
+    Get the installed code2prompt version.
+    
+    The result is cached for the lifetime of the process.
+    
+    Returns:
+        Optional[str]: The version string, or None if code2prompt is not installed
     """
     try:
         result = subprocess.run(
-            ["code2prompt", "--version"], 
+            [_resolve_executable("code2prompt"), "--version"], 
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            check=False
+            check=False,
+            close_fds=False,
+            bufsize=-1
         )
-        return result.returncode == 0
     except FileNotFoundError:
-        return False
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.decode().strip()
+
+
+def check_code2prompt_installed() -> bool:
+    """
+    Check if code2prompt is installed.
+    
+    Returns:
+        bool: True if code2prompt is installed, False otherwise
+    """
+    return get_code2prompt_version() is not None
 
 
 def install_code2prompt() -> bool:
@@ -43,10 +107,12 @@ def install_code2prompt() -> bool:
     try:
         # Check if cargo is installed
         cargo_check = subprocess.run(
-            ["cargo", "--version"], 
+            [_resolve_executable("cargo"), "--version"], 
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            check=False
+            check=False,
+            close_fds=False,
+            bufsize=-1
         )
         
         if cargo_check.returncode != 0:
@@ -55,14 +121,18 @@ def install_code2prompt() -> bool:
         
         # Install code2prompt
         install_process = subprocess.run(
-            ["cargo", "install", "code2prompt"],
+            [_resolve_executable("cargo"), "install", "code2prompt"],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            check=False
+            check=False,
+            close_fds=False,
+            bufsize=-1
         )
         
         if install_process.returncode == 0:
             logger.info("code2prompt installed successfully")
+            _resolve_executable.cache_clear()
+            get_code2prompt_version.cache_clear()
             return True
         else:
             logger.error(f"Failed to install code2prompt: {install_process.stderr.decode()}")
@@ -72,10 +142,22 @@ def install_code2prompt() -> bool:
         return False
 
 
+def _join_patterns(patterns: Union[str, List[str]]) -> str:
+    """Format glob patterns as a comma-separated code2prompt argument"""
+    return patterns if isinstance(patterns, str) else ",".join(patterns)
+
+
+def _split_patterns(patterns: Optional[Union[str, List[str]]]) -> List[str]:
+    """Format glob patterns as the list expected by the code2prompt bindings"""
+    if not patterns:
+        return []
+    return patterns.split(",") if isinstance(patterns, str) else list(patterns)
+
+
 def get_codebase_with_code2prompt(
     codebase_path: str = None,
-    include_patterns: Optional[List[str]] = None,
-    exclude_patterns: Optional[List[str]] = None,
+    include_patterns: Optional[Union[str, List[str]]] = None,
+    exclude_patterns: Optional[Union[str, List[str]]] = None,
     include_hidden: bool = False,
     respect_gitignore: bool = True,
     add_line_numbers: bool = True,
@@ -86,8 +168,10 @@ def get_codebase_with_code2prompt(
     
     Args:
         codebase_path: Path to the codebase. If None, uses current directory.
-        include_patterns: List of glob patterns to include (e.g. ["*.py", "*.js"])
-        exclude_patterns: List of glob patterns to exclude (e.g. ["*.md", "*.txt"])
+        include_patterns: List of glob patterns to include (e.g. ["*.py", "*.js"]),
+            or the same patterns as a comma-separated string (e.g. "*.py,*.js")
+        exclude_patterns: List of glob patterns to exclude (e.g. ["*.md", "*.txt"]),
+            or the same patterns as a comma-separated string (e.g. "*.md,*.txt")
         include_hidden: Whether to include hidden files and directories
         respect_gitignore: Whether to respect .gitignore rules
         add_line_numbers: Whether to add line numbers to source code
@@ -100,6 +184,22 @@ def get_codebase_with_code2prompt(
     if codebase_path is None:
         codebase_path = os.getcwd()
     
+    # Generate the prompt in-process when the bindings are available. The SDK always
+    # applies .gitignore rules, so disabling them still needs the CLI.
+    if Code2Prompt is not None and output_format == "text" and respect_gitignore:
+        session = Code2Prompt(
+            path=codebase_path,
+            include_patterns=_split_patterns(include_patterns),
+            exclude_patterns=_split_patterns(exclude_patterns),
+            include_hidden=include_hidden,
+            line_numbers=add_line_numbers
+        )
+        try:
+            return session.generate().prompt
+        except (RuntimeError, ValueError, OSError) as e:
+            # Errors raised while walking or rendering the codebase
+            logger.warning(f"Error using code2prompt bindings: {str(e)}. Falling back to the CLI.")
+    
     # Ensure code2prompt is installed
     if not check_code2prompt_installed():
         if not install_code2prompt():
@@ -107,14 +207,14 @@ def get_codebase_with_code2prompt(
             return "" if output_format == "text" else {"prompt": "", "files": []}
     
     # Build command
-    cmd = ["code2prompt", codebase_path]
+    cmd = [_resolve_executable("code2prompt"), codebase_path]
     
     # Add optional flags
     if include_patterns:
-        cmd.extend(["--include", ",".join(include_patterns)])
+        cmd.extend(["--include", _join_patterns(include_patterns)])
     
     if exclude_patterns:
-        cmd.extend(["--exclude", ",".join(exclude_patterns)])
+        cmd.extend(["--exclude", _join_patterns(exclude_patterns)])
     
     if include_hidden:
         cmd.append("--hidden")
@@ -129,53 +229,60 @@ def get_codebase_with_code2prompt(
     if output_format == "json":
         cmd.append("--json")
     
-    # Create a temporary file to store the output
-    with tempfile.NamedTemporaryFile(mode='w+', delete=False) as temp_file:
+    # The CLI prints status lines to stdout, so have it write the prompt to a file
+    # on tmpfs (when /tmp is available) instead of mixing the two
+    with tempfile.NamedTemporaryFile(dir=_TEMP_DIR, prefix='c2p_', delete=False) as temp_file:
         temp_path = temp_file.name
     
     cmd.extend(["--output", temp_path])
     
     logger.info(f"Running command: {' '.join(cmd)}")
     
+    # stderr is only ever used in the error log, so discard it when that would be dropped
+    capture_stderr = logger.isEnabledFor(logging.ERROR)
+    
     try:
         # Run code2prompt
         process = subprocess.run(
             cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=False
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL,
+            check=False,
+            close_fds=False,
+            bufsize=-1
         )
         
         if process.returncode != 0:
-            logger.error(f"Error running code2prompt: {process.stderr.decode()}")
-            os.unlink(temp_path)
+            if capture_stderr:
+                logger.error(f"Error running code2prompt: {process.stderr.decode()}")
             return "" if output_format == "text" else {"prompt": "", "files": []}
         
-        # Read the result from the temporary file
-        with open(temp_path, 'r') as f:
-            content = f.read()
-        
-        # Delete the temporary file
-        os.unlink(temp_path)
-        
-        # Parse JSON if needed
-        if output_format == "json":
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                logger.error("Failed to parse JSON output from code2prompt")
-                return {"prompt": content, "files": []}
-        
-        return content
+        with open(temp_path, 'rb') as f:
+            # Drop the name right away; the inode is released when the file is closed
+            os.unlink(temp_path)
+            if os.fstat(f.fileno()).st_size == 0:
+                return "" if output_format == "text" else {"prompt": "", "files": []}
+            
+            # Decode from a read-only mapping rather than copying the file into a buffer
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Parse JSON straight from the raw bytes so the output is decoded only once
+                if output_format == "json":
+                    try:
+                        return json_loads(mm[:])
+                    except ValueError:
+                        logger.error("Failed to parse JSON output from code2prompt")
+                        return {"prompt": str(mm, 'utf-8', 'replace'), "files": []}
+                
+                return str(mm, 'utf-8', 'replace')
     
     except Exception as e:
         logger.error(f"Error using code2prompt: {str(e)}")
-        
-        # Clean up temp file if it exists
+        return "" if output_format == "text" else {"prompt": "", "files": []}
+    
+    finally:
+        # Clean up the temp file if code2prompt failed before it was read
         if os.path.exists(temp_path):
             os.unlink(temp_path)
-            
-        return "" if output_format == "text" else {"prompt": "", "files": []}
 
 
 def get_codebase(codebase_path: str = None) -> str:
@@ -191,21 +298,10 @@ def get_codebase(codebase_path: str = None) -> str:
     Returns:
         str: A formatted string containing all code with file paths as headers
     """
-    # Default include patterns - match the original function's extensions
-    code_extensions = [
-        "*.py", "*.js", "*.jsx", "*.ts", "*.tsx", "*.css", "*.scss", "*.html",
-        "*.vue", "*.go", "*.java", "*.cpp", "*.c", "*.h", "*.rs", "*.sql", 
-        "*.md", "*.txt", "*.json", "*.yaml", "*.yml", "*.toml", "*.ini", 
-        "*.conf", "*.cfg", "*.properties", "*.env", "*.lock"
-    ]
-    
-    # Exclude package-lock.json files to match original function
-    exclude_patterns = ["package-lock.json"]
-    
     return get_codebase_with_code2prompt(
         codebase_path=codebase_path,
-        include_patterns=code_extensions,
-        exclude_patterns=exclude_patterns,
+        include_patterns=_DEFAULT_INCLUDE_STR,
+        exclude_patterns=_DEFAULT_EXCLUDE_STR,
         include_hidden=False,
         respect_gitignore=True,
         add_line_numbers=True,
@@ -214,6 +310,11 @@ def get_codebase(codebase_path: str = None) -> str:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    
     # Example usage
     print("Checking if code2prompt is installed...")
     if not check_code2prompt_installed():
@@ -1,16 +1,58 @@
+import io
+import itertools
 import os
+import re
+import sys
 import logging
+import pathspec
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 from .code2prompt_utils import get_codebase as code2prompt_get_codebase
 
-# Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,  # Changed from INFO to WARNING to disable most logs
-    format='%(asctime)s - %(levelname)s - %(message)s'
+# liburing bindings enable batched io_uring reads in the legacy path on Linux
+try:
+    from liburing import (
+        Ring,
+        Cqe,
+        io_uring_queue_init,
+        io_uring_queue_exit,
+        io_uring_get_sqe,
+        io_uring_prep_read,
+        io_uring_sqe_set_data64,
+        io_uring_submit,
+        io_uring_wait_cqe,
+        io_uring_cqe_seen
+    )
+except ImportError:
+    Ring = None
+
+# Code file extensions to include (os.path.splitext only returns the last suffix)
+CODE_EXTENSIONS = frozenset({'.py', '.js', '.jsx', '.ts', '.tsx', '.css', '.scss', '.html', '.vue', '.go', '.java', '.cpp', '.c', '.h', '.rs', '.sql', '.md', '.txt', '.json', '.yaml', '.yml', '.toml', '.ini', '.conf', '.cfg', '.properties', '.env', '.lock', '.lockb'})
+
+# Matches code file names and captures their extension, mirroring os.path.splitext:
+# the name needs a non-dot character before the final dot, so dotfiles such as
+# '.env' are not treated as having an extension. package-lock.json is excluded.
+CODE_FILE_RE = re.compile(
+    r'(?!package-lock\.json\Z).*[^.].*\.(%s)\Z'
+    % '|'.join(sorted(re.escape(ext[1:]) for ext in CODE_EXTENSIONS)),
+    re.DOTALL
 )
+
+# Number of reads submitted to the io_uring ring at once
+IO_URING_BATCH_SIZE = 256
+
+# Number of codebase prompts kept by get_codebase
+CODEBASE_CACHE_SIZE = 8
+
+# Most recent prompt per absolute codebase path, as (fingerprint, prompt) pairs
+_codebase_cache: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+
+# Module logger; handlers are left to the application to configure
 logger = logging.getLogger(__name__)
 
 
-def get_codebase(codebase_path: str = None) -> str:
+def get_codebase(codebase_path: str = None, use_cache: bool = False) -> str:
     """
     Generates a prompt containing the entire codebase by recursively reading all code files.
     
@@ -19,16 +61,149 @@ def get_codebase(codebase_path: str = None) -> str:
     
     Args:
         codebase_path: Optional custom path to the codebase. If None, uses current directory.
+        use_cache: Whether to reuse the prompt from an earlier call for the same directory
+            while none of its code files have been added, removed or modified. Checking
+            costs one walk of the tree, so only enable it for repeated calls. Changes are
+            detected with the legacy implementation's file rules, which can differ from
+            code2prompt's own filtering: edits to a file only code2prompt includes (or that
+            the legacy walk prunes) are not noticed and return the stale cached prompt.
     
     Returns:
         str: A formatted string containing all code with file paths as headers
     """
+    if codebase_path is None:
+        codebase_path = os.getcwd()
+    codebase_path = os.path.abspath(codebase_path)
+    
+    if use_cache:
+        fingerprint = _codebase_fingerprint(codebase_path)
+        cached = _codebase_cache.get(codebase_path)
+        if cached is not None and cached[0] == fingerprint:
+            _codebase_cache.move_to_end(codebase_path)
+            return cached[1]
+    
     try:
         # Try to use code2prompt
-        return code2prompt_get_codebase(codebase_path)
+        prompt = code2prompt_get_codebase(codebase_path)
     except Exception as e:
         logger.warning(f"Failed to use code2prompt: {str(e)}. Falling back to legacy implementation.")
-        return get_codebase_legacy(codebase_path)
+        prompt = get_codebase_legacy(codebase_path)
+    
+    # Only keep real prompts, so a failed run (which yields "") is retried next time
+    if use_cache and prompt:
+        _codebase_cache[codebase_path] = (fingerprint, prompt)
+        _codebase_cache.move_to_end(codebase_path)
+        while len(_codebase_cache) > CODEBASE_CACHE_SIZE:
+            _codebase_cache.popitem(last=False)
+    return prompt
+
+
+def _codebase_fingerprint(codebase_path: str) -> int:
+    """
+    Compute a cheap fingerprint of the code files below a directory.
+    
+    XORs together a hash of (path, mtime, size) for every code file and .gitignore
+    that get_codebase_legacy would see, so it changes whenever one of them is added,
+    removed or modified. Ignored directories are pruned, as in the legacy walk.
+    Files that only code2prompt's own filtering includes are not tracked.
+    
+    Args:
+        codebase_path: Path to the codebase
+    
+    Returns:
+        int: The fingerprint
+    """
+    code_files, gitignore_files = _collect_code_files(codebase_path)
+    fingerprint = 0
+    tracked_files = ((entry, rel_path) for entry, rel_path, _ in code_files)
+    for entry, rel_path in itertools.chain(tracked_files, gitignore_files):
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        fingerprint ^= hash((rel_path, stat.st_mtime_ns, stat.st_size))
+    return fingerprint
+
+
+def _collect_code_files(codebase_path: str) -> Tuple[List[Tuple[os.DirEntry, str, str]], List[Tuple[os.DirEntry, str]]]:
+    """
+    Walk a codebase once, pruning .git and anything a .gitignore excludes.
+    
+    Args:
+        codebase_path: Path to the codebase
+    
+    Returns:
+        Tuple: (entry, relative path, extension without the dot) for each code file,
+            and (entry, relative path) for each .gitignore that was applied
+    """
+    code_files = []
+    gitignore_files = []
+    
+    def load_gitignore_spec(gitignore_path):
+        """Compile a .gitignore file into a GitIgnoreSpec, or None if it cannot be read"""
+        try:
+            with open(gitignore_path, 'r') as f:
+                return pathspec.GitIgnoreSpec.from_lines(f)
+        except Exception as e:
+            logger.error(f"Error reading {gitignore_path}: {str(e)}")
+        return None
+
+    def is_ignored(rel_path, specs):
+        """Check a path (with a trailing '/' for directories) against the inherited gitignore specs.
+
+        As in git, the deepest .gitignore with a matching pattern decides, so a nested
+        '!pattern' can re-include a path that a parent .gitignore ignores.
+        """
+        for base, spec in reversed(specs):
+            include = spec.check_file(rel_path[len(base):]).include
+            if include is not None:
+                return include
+        return False
+
+    def walk(directory, rel_dir, specs):
+        """Collect code files below directory, pruning anything a .gitignore excludes.
+
+        specs holds (rel_base, GitIgnoreSpec) pairs inherited from parent directories,
+        where rel_base is the prefix the .gitignore's patterns are relative to.
+        Like os.walk, a directory's files are collected before its subdirectories,
+        and symlinked directories are not followed.
+        """
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            logger.error(f"Error reading {directory}: {str(e)}")
+            return
+        
+        # Pick up the directory's .gitignore from the listing rather than a separate stat
+        for entry in entries:
+            if entry.name == '.gitignore' and entry.is_file():
+                spec = load_gitignore_spec(entry.path)
+                if spec is not None:
+                    specs = specs + ((rel_dir, spec),)
+                    gitignore_files.append((entry, rel_dir + entry.name))
+                break
+        
+        subdirs = []
+        for entry in entries:
+            rel_path = rel_dir + entry.name
+            if entry.is_dir():
+                if not entry.is_symlink() and entry.name != '.git':
+                    subdirs.append((entry, rel_path))
+                continue
+            
+            # One regex match covers the extension filter and package-lock.json exclusion
+            match = CODE_FILE_RE.match(entry.name)
+            if match is None or is_ignored(rel_path, specs):
+                continue
+            
+            code_files.append((entry, rel_path, match.group(1)))
+        
+        for entry, rel_path in subdirs:
+            if not is_ignored(rel_path + '/', specs):
+                walk(entry.path, rel_path + '/', specs)
+
+    walk(codebase_path, '', ())
+    return code_files, gitignore_files
 
 
 def get_codebase_legacy(codebase_path: str = None) -> str:
@@ -43,76 +218,170 @@ def get_codebase_legacy(codebase_path: str = None) -> str:
         str: A formatted string containing all code with file paths as headers
     """
     logger.debug("Getting codebase using legacy method")
-    codebase_prompt = []
-        
-    # Code file extensions to include
-    CODE_EXTENSIONS = {'.py', '.js', '.jsx', '.ts', '.tsx', '.css', '.scss', '.html', '.vue', '.go', '.java', '.cpp', '.c', '.h', '.rs', '.sql', '.md', '.txt', '.json', '.yaml', '.yml', '.toml', '.ini', '.conf', '.cfg', '.properties', '.env', '.lock', '.lockb', '.lock.json', '.lock.yaml', '.lock.yml', '.lock.toml', '.lock.ini', '.lock.conf', '.lock.cfg', '.lock.properties', '.lock.env'}
+    if codebase_path is None:
+        codebase_path = os.getcwd()
+    
+    # Single pass: collect gitignore rules and candidate files together
+    logger.debug("Collecting code files")
+    code_files, _ = _collect_code_files(codebase_path)
+
+    logger.debug("Reading files for codebase")
+    file_paths = [entry.path for entry, _, _ in code_files]
+    contents = None
+    if sys.platform.startswith('linux') and Ring is not None:
+        try:
+            contents = _read_files_io_uring(file_paths)
+        except Exception as e:
+            logger.warning(f"Failed to read files with io_uring: {str(e)}. Falling back to threads.")
+    if contents is None:
+        contents = _read_files_threaded(file_paths)
+    
+    # Stream the prompt into one buffer, separating file blocks with a blank line
+    codebase_prompt = io.StringIO()
+    for (entry, relative_path, file_ext), data in zip(code_files, contents):
+        if data is None:
+            continue
+        try:
+            content = data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            logger.error(f"Error reading {entry.path}: {str(e)}")
+            continue
+        # Match text-mode reads, which translate universal newlines
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        if codebase_prompt.tell():
+            codebase_prompt.write('\n')
+        codebase_prompt.write('\n### ')
+        codebase_prompt.write(relative_path)
+        # Tag the code block with the file type for syntax highlighting
+        codebase_prompt.write('\n```')
+        codebase_prompt.write(file_ext)
+        codebase_prompt.write('\n')
+        codebase_prompt.write(content)
+        codebase_prompt.write('\n```\n')
+                    
+    logger.debug("Successfully generated codebase")
+    return codebase_prompt.getvalue()
+
+
+def _read_files_threaded(file_paths: List[str]) -> List[Optional[bytes]]:
+    """
+    Read files concurrently on a thread pool.
     
-    # Store gitignore patterns from all .gitignore files
-    gitignore_patterns = {}
+    File reads are I/O bound and release the GIL, so threads overlap their latency.
     
-    def load_gitignore_patterns(directory):
-        """Load gitignore patterns from a directory's .gitignore file if it exists"""
-        gitignore_path = os.path.join(directory, '.gitignore')
-        if os.path.exists(gitignore_path):
+    Args:
+        file_paths: Paths of the files to read
+    
+    Returns:
+        List[Optional[bytes]]: Raw contents in the same order, None for unreadable files
+    """
+    def read_file(file_path):
+        """Read a file's raw bytes, returning None if it cannot be read"""
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
             try:
-                with open(gitignore_path, 'r') as f:
-                    return [line.strip() for line in f if line.strip() and not line.startswith('#')]
-            except Exception as e:
-                logger.error(f"Error reading {gitignore_path}: {str(e)}")
-        return []
-
-    def is_ignored(path):
-        """Check if path matches any gitignore pattern from parent directories"""
-        rel_path = os.path.relpath(path, codebase_path)
-        current_dir = os.path.dirname(path)
-        
-        # Check patterns from current and all parent directories
-        while current_dir >= codebase_path:
-            if current_dir in gitignore_patterns:
-                for pattern in gitignore_patterns[current_dir]:
-                    if pattern.endswith('/'):
-                        if rel_path.startswith(pattern):
-                            return True
-                    elif pattern.startswith('*'):
-                        if rel_path.endswith(pattern[1:]):
-                            return True
-                    elif pattern in rel_path:
-                        return True
-            current_dir = os.path.dirname(current_dir)
-        return False
+                # Read the whole file with one syscall, bypassing the buffered IO stack
+                size = os.fstat(fd).st_size
+                data = os.read(fd, size)
+                # Very large files can come back short, so finish those off
+                while len(data) < size:
+                    chunk = os.read(fd, size - len(data))
+                    if not chunk:
+                        break
+                    data += chunk
+                return data
+            finally:
+                os.close(fd)
+        except Exception as e:
+            logger.error(f"Error reading {file_path}: {str(e)}")
+            return None
 
-    # First pass: collect all gitignore patterns
-    logger.debug("Collecting gitignore patterns")
-    for root, _, _ in os.walk(codebase_path):
-        patterns = load_gitignore_patterns(root)
-        if patterns:
-            gitignore_patterns[root] = patterns
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read_file, file_paths))
 
-    # Second pass: read files
-    logger.debug("Reading files for codebase")
-    for root, _, files in os.walk(codebase_path):
-        for file in files:
-            file_path = os.path.join(root, file)
-            file_ext = os.path.splitext(file)[1]
-            
-            if file_ext not in CODE_EXTENSIONS:
-                continue
+
+def _read_files_io_uring(file_paths: List[str], batch_size: int = IO_URING_BATCH_SIZE) -> List[Optional[bytes]]:
+    """
+    Read files from a single thread by batching read requests through io_uring.
+    
+    Files are opened and sized up front, then one read per file is queued and
+    submitted in batches of batch_size, so the kernel services them in parallel.
+    
+    Args:
+        file_paths: Paths of the files to read
+        batch_size: Number of reads submitted to the ring at once
+    
+    Returns:
+        List[Optional[bytes]]: Raw contents in the same order, None for unreadable files
+    """
+    contents = [None] * len(file_paths)
+    ring = Ring()
+    cqe = Cqe()
+    io_uring_queue_init(batch_size, ring)
+    try:
+        for start in range(0, len(file_paths), batch_size):
+            # Queue one read per file in this batch, keyed by its index
+            pending = {}
+            try:
+                for index in range(start, min(start + batch_size, len(file_paths))):
+                    file_path = file_paths[index]
+                    try:
+                        fd = os.open(file_path, os.O_RDONLY)
+                    except OSError as e:
+                        logger.error(f"Error reading {file_path}: {str(e)}")
+                        continue
+                    try:
+                        size = os.fstat(fd).st_size
+                    except OSError as e:
+                        os.close(fd)
+                        logger.error(f"Error reading {file_path}: {str(e)}")
+                        continue
+                    if size == 0:
+                        os.close(fd)
+                        contents[index] = b""
+                        continue
+                    buf = bytearray(size)
+                    sqe = io_uring_get_sqe(ring)
+                    io_uring_prep_read(sqe, fd, buf, 0)
+                    io_uring_sqe_set_data64(sqe, index)
+                    pending[index] = (fd, buf)
                 
-            # Skip package-lock.json files
-            if file == "package-lock.json":
-                continue
+                if not pending:
+                    continue
+                io_uring_submit(ring)
                 
-            if not is_ignored(file_path):
-                try:
-                    with open(file_path, 'r') as f:
-                        content = f.read()
-                        relative_path = os.path.relpath(file_path, codebase_path)
-                        # Detect file type for syntax highlighting
-                        ext = file_ext[1:]  # Remove the dot
-                        codebase_prompt.append(f"\n### {relative_path}\n```{ext}\n{content}\n```\n")
-                except Exception as e:
-                    logger.error(f"Error reading {file_path}: {str(e)}")
+                # Drain one completion per queued read
+                for _ in range(len(pending)):
+                    io_uring_wait_cqe(ring, cqe)
+                    entry = cqe[0]
+                    index = entry.user_data
+                    try:
+                        res = entry.res
+                    except OSError as e:
+                        res = None
+                        logger.error(f"Error reading {file_paths[index]}: {str(e)}")
+                    io_uring_cqe_seen(ring, entry)
                     
-    logger.debug("Successfully generated codebase")
-    return "\n".join(codebase_prompt) 
\ No newline at end of file
+                    fd, buf = pending.pop(index)
+                    try:
+                        if res is not None:
+                            data = bytes(buf[:res])
+                            # Finish short reads synchronously, as _read_files_threaded does
+                            while len(data) < len(buf):
+                                chunk = os.pread(fd, len(buf) - len(data), len(data))
+                                if not chunk:
+                                    break
+                                data += chunk
+                            contents[index] = data
+                    except OSError as e:
+                        logger.error(f"Error reading {file_paths[index]}: {str(e)}")
+                    finally:
+                        os.close(fd)
+            finally:
+                for fd, _ in pending.values():
+                    os.close(fd)
+    finally:
+        io_uring_queue_exit(ring)
+    return contents